@@ -1,21 +1,32 @@
 """This file defines cogs for the Full Course Yellow bot, providing functionality
 that can be imported into the scope of a pycord Bot."""
-# pylint: disable = logging-not-lazy, too-many-arguments
+# pylint: disable = too-many-arguments
 
+import asyncio
+import collections
 import datetime
 import discord  # This uses pycord, not discord.py
 from discord.ext import commands
+import functools
 import logging
+import time
 import typing
 from typing import Optional
 
 import full_course_yellow as fcy
 import fcy_guilds
 import fcy_constants
-from fcy_types import *  # pylint: disable = wildcard-import, unused-wildcard-import
+from fcy_types import Actor, ActorID, GuildID
 
 fcy_logger = logging.getLogger("full_course_yellow")
 
+MUTUAL_MGS_CACHE_TTL = 60  # How long (in seconds) the results of get_mutual_monitored_guilds are reused for
+MUTUAL_MGS_CACHE_MAX_SIZE = 1024  # How many users' results get_mutual_monitored_guilds keeps before discarding the least recently used
+ALERT_COALESCE_WINDOW = 10  # How long (in seconds) after an alert starts sending that a new alert for the same user is merged into it
+MAX_CONCURRENT_ALERT_SENDS = 16  # How many alert messages can be in flight to Discord at once
+POPULATE_RETRY_DELAY = 30  # How long (in seconds) to wait before retrying a failed population of alert_guild_members
+GATEWAY_MEMBER_QUERY_TIMEOUT = 1.5  # How long (in seconds) to wait on the gateway for a member before using the REST API
+
 
 class CommandUserError(Exception):
     """A user invoked a command improperly in some way.
@@ -27,34 +38,105 @@ class CommandUserError(Exception):
 class FCYFunctionality(commands.Cog):
     """This cog implements the majority of the functionality for the Full Course Yellow bot."""
 
-    alert_guild_members: set[str]
+    alert_guild_members: set[ActorID]
+    alert_guild_members_ready: asyncio.Event  # This is set once alert_guild_members has been populated
+    alert_guild_members_task: Optional[asyncio.Task]
+    mutual_mgs_cache: collections.OrderedDict[ActorID, tuple[float, list[fcy_guilds.MonitoredGuild]]]  # {Actor ID: (time.monotonic(), MGs)}
+    inflight_mutual_mgs_lookups: dict[ActorID, asyncio.Task]  # {Actor ID: query_mutual_monitored_guilds task}
+    # {(Actor ID, testing_guilds_only): (time.monotonic() when started, send_alerts task)}
+    inflight_alerts: dict[tuple[ActorID, bool], tuple[float, asyncio.Task]]
+    inflight_member_lookups: dict[tuple[GuildID, ActorID], asyncio.Task]
+    alert_send_semaphore: asyncio.Semaphore  # Caps how many alert messages are sent in parallel
 
     def __init__(self, bot: fcy.FCYBot) -> None:
         self.bot = bot
         self.alert_guild_members = set()
+        self.alert_guild_members_ready = asyncio.Event()
+        self.alert_guild_members_task = None
+        self.mutual_mgs_cache = collections.OrderedDict()  # Ordered from least to most recently used
+        self.inflight_mutual_mgs_lookups = {}
+        self.inflight_alerts = {}
+        self.inflight_member_lookups = {}
+        self.alert_send_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ALERT_SENDS)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member) -> None:
-        """When a new member joins, if the joined guild is an AlertGuild, update alert_guild_members."""
-        if member.guild.id in fcy_constants.ENABLED_ALERT_GUILDS:
-            self.alert_guild_members.add(str(member.id))
+        """When a new member joins, if the joined guild is an AlertGuild, update alert_guild_members.
+        If the joined guild is a MonitoredGuild, forget any cached mutual guilds for the member."""
+        if member.guild.id in fcy_constants.ENABLED_ALERT_GUILD_IDS:
+            self.alert_guild_members.add(member.id)
+        if member.guild.id in fcy_constants.ENABLED_MONITORED_GUILD_IDS:
+            self.forget_mutual_monitored_guilds(member.id)
 
     @commands.Cog.listener()
     async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent) -> None:
         """When a member leaves, if the left guild is an AlertGuild, update alert_guild_members.
+        If the left guild is a MonitoredGuild, forget any cached mutual guilds for the member.
         This needs to be the RAW member remove event because the normal member remove event
         depends on the member cache, which we're not using."""
 
-        if payload.guild_id in fcy_constants.ENABLED_ALERT_GUILDS:
-            self.alert_guild_members.remove(payload.user.id) # type: ignore - why isn't this working?
+        if payload.guild_id in fcy_constants.ENABLED_ALERT_GUILD_IDS:
+            self.alert_guild_members.discard(payload.user.id)
+        if payload.guild_id in fcy_constants.ENABLED_MONITORED_GUILD_IDS:
+            self.forget_mutual_monitored_guilds(payload.user.id)
+
+    def invalidate_installed_guild_roles(self, guild_id: GuildID) -> None:
+        """Discard the cached roles_dict of every InstalledGuild for the provided Guild ID.
+        A single Guild can be both a MonitoredGuild and an AlertGuild, so both need to be checked."""
+        for installed_guilds in (fcy_constants.ENABLED_MONITORED_GUILDS, fcy_constants.ENABLED_ALERT_GUILDS):
+            if (installed_guild := installed_guilds.get(guild_id)) is not None:
+                installed_guild.invalidate_roles_dict()
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role) -> None:
+        """When a role is created, forget the cached roles of any InstalledGuild it was created in."""
+        self.invalidate_installed_guild_roles(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        """When a role is deleted, forget the cached roles of any InstalledGuild it was deleted from."""
+        self.invalidate_installed_guild_roles(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, _: discord.Role, after: discord.Role) -> None:
+        """When a role is updated, forget the cached roles of any InstalledGuild it belongs to."""
+        self.invalidate_installed_guild_roles(after.guild.id)
+
+    def invalidate_alert_channel(self, channel: discord.abc.GuildChannel) -> None:
+        """If the provided channel is an enabled AlertGuild's alert channel, forget that AlertGuild's cached alert channel."""
+        if (
+            (alert_guild := fcy_constants.ENABLED_ALERT_GUILDS.get(channel.guild.id)) is not None
+            and alert_guild.alert_channel_id == channel.id
+        ):
+            alert_guild.invalidate_alert_channel()
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        """When a channel is deleted, forget it if it was cached as an AlertGuild's alert channel."""
+        self.invalidate_alert_channel(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, _: discord.abc.GuildChannel, after: discord.abc.GuildChannel) -> None:
+        """When a channel is updated, forget it if it was cached as an AlertGuild's alert channel."""
+        self.invalidate_alert_channel(after)
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
-        """Execute a number of tasks that need to happen at the bot's startup."""
+        """Execute a number of tasks that need to happen at the bot's startup.
+
+        Populating alert_guild_members means paging through every member of every AlertGuild, which is slow,
+        so it's kicked off in the background instead of holding up the rest of the bot's startup."""
+
+        def log_populate_failure(task: asyncio.Task) -> None:
+            if not task.cancelled() and (ex := task.exception()) is not None:
+                fcy_logger.error("Failed to populate FCYFunctionality.alert_guild_members!", exc_info = ex)
+
         self.check_populate_installed_guilds()
-        await self.populate_alert_guild_members()
-        fcy_logger.debug(f"Enabled MonitoredGuilds: {[g.name for g in fcy_constants.ENABLED_MONITORED_GUILDS.values()]}")
-        fcy_logger.debug(f"Enabled AlertGuilds: {[g.name for g in fcy_constants.ENABLED_ALERT_GUILDS.values()]}")
+        if self.alert_guild_members_task is None or self.alert_guild_members_task.done():
+            self.alert_guild_members_task = asyncio.create_task(self.populate_alert_guild_members_with_retries())
+            self.alert_guild_members_task.add_done_callback(log_populate_failure)
+        fcy_logger.debug("Enabled MonitoredGuilds: %s", [g.name for g in fcy_constants.ENABLED_MONITORED_GUILD_OBJECTS])
+        fcy_logger.debug("Enabled AlertGuilds: %s", [g.name for g in fcy_constants.ENABLED_ALERT_GUILD_OBJECTS])
         fcy_logger.info("FCYFunctionality.on_ready has completed successfully.")
 
     @commands.Cog.listener()
@@ -73,88 +155,210 @@ class FCYFunctionality(commands.Cog):
         if entry.action != discord.AuditLogAction.ban:
             return
 
-        if entry.guild.id not in fcy_constants.ALL_ENABLED_GUILDS:
+        if entry.guild.id not in fcy_constants.ALL_ENABLED_GUILD_IDS:
             raise commands.GuildNotFound(
                 f"Could not process audit log entry for guild {entry.guild.id} / {entry.guild.name}: "
                 f"guild is not an InstalledGuild, or guild is not enabled"
             )
 
-        if entry.guild.id not in fcy_constants.ENABLED_MONITORED_GUILDS:
+        if (monitored_guild := fcy_constants.ENABLED_MONITORED_GUILDS.get(entry.guild.id)) is None:
             # We know that it's an enabled InstalledGuild, so if the lookup in MONITORED_GUILDS
             # fails, that just means it's an AlertGuild. In that case, we don't want to process this ALE.
             return
 
-        ale_handler = fcy_constants.ENABLED_MONITORED_GUILDS[entry.guild.id].audit_log_handler
-        if ale_handler(entry) is True:
+        if monitored_guild.audit_log_handler(entry) is True:
             await self.send_alerts(
                 offending_actor = await self.bot.solidify_actor_abstract(entry._target_id), # pylint: disable = protected-access
                 alerting_server_name = entry.guild.name,
                 alert_reason = entry.reason,
                 message_body = "A new permanent ban has been detected!",
-                testing_guilds_only = fcy_constants.ENABLED_MONITORED_GUILDS[entry.guild.id].testing,
+                testing_guilds_only = monitored_guild.testing,
             )
 
+    async def fetch_monitored_guild_member(
+        self,
+        monitored_guild: fcy_guilds.MonitoredGuild,
+        actor: Actor,
+    ) -> Optional[discord.Member]:
+        """Look for the provided Actor in the provided MonitoredGuild, returning their Member if they're present, else None.
+
+        If a lookup for the same Actor in the same MonitoredGuild is already in progress (e.g. two moderators scanning
+        the same user at once), this waits on that lookup instead of sending a second, identical request."""
+
+        lookup_key = (monitored_guild.id, actor.id)
+        if (lookup := self.inflight_member_lookups.get(lookup_key)) is None:
+            lookup = asyncio.create_task(self.query_monitored_guild_member(monitored_guild, actor))
+            self.inflight_member_lookups[lookup_key] = lookup
+
+            def forget_lookup(task: asyncio.Task, key: tuple[GuildID, ActorID] = lookup_key) -> None:
+                if self.inflight_member_lookups.get(key) is task:  # It may have been replaced after an invalidation
+                    del self.inflight_member_lookups[key]
+
+            lookup.add_done_callback(forget_lookup)
+        return await asyncio.shield(lookup)  # One waiter being cancelled shouldn't cancel the lookup for everyone else
+
     @staticmethod
-    async def get_mutual_monitored_guilds(actor: Actor) -> list[fcy_guilds.MonitoredGuild]:
+    async def query_monitored_guild_member(
+        monitored_guild: fcy_guilds.MonitoredGuild,
+        actor: Actor,
+    ) -> Optional[discord.Member]:
+        """Ask Discord whether the provided Actor is in the provided MonitoredGuild, returning their Member if so, else None.
+
+        This asks for the member over the gateway (a "Request Guild Members" request) instead of over the REST API,
+        since the REST API's rate limits are shared with everything else the bot does (sending alerts, etc.).
+        If the gateway doesn't answer within GATEWAY_MEMBER_QUERY_TIMEOUT seconds (pycord's own timeout is 30 seconds,
+        far beyond the time we have to respond to an interaction), this falls back to the REST API, which raises
+        discord.NotFound if the member isn't present."""
+        try:
+            members = await asyncio.wait_for(
+                monitored_guild.guild.query_members(user_ids = [actor.id], limit = 1, cache = False),
+                timeout = GATEWAY_MEMBER_QUERY_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            fcy_logger.warning(
+                "Timed out querying MonitoredGuild %s for actor ID %s over the gateway; falling back to the REST API.",
+                monitored_guild.name,
+                actor.id,
+            )
+            return await monitored_guild.guild.fetch_member(actor.id)
+        return members[0] if members else None
+
+    async def get_mutual_monitored_guilds(self, actor: Actor) -> list[fcy_guilds.MonitoredGuild]:
         """This wraps the process of retrieving the list of MonitoredGuilds that contain the provided Actor.
 
-        This is done by attempting to fetch the member from each of the MonitoredGuilds, instead of simply
-        caching members and using a get, because that would require that we cache and track offline members
+        This is done by asking each of the MonitoredGuilds for the member (see fetch_monitored_guild_member),
+        instead of simply caching members and using a get, because that would require that we cache and track offline members
         (because it's critical that we detect whether the user is present in the MonitoredGuild, even if
         they're offline), and the servers that this particular bot will be installed in are HUMONGOUS;
         as a result, caching members is both extremely slow and extremely expensive.
 
-        Ultimately, a single fetch for each guild is going to be a lot less work."""
+        Ultimately, a single fetch for each guild is going to be a lot less work. The fetches are independent
+        of one another, so they're all dispatched at once rather than waiting on each guild in turn.
+
+        The result is reused for MUTUAL_MGS_CACHE_TTL seconds, so that repeated alerts/scans for the same user
+        don't query every MonitoredGuild again; at most MUTUAL_MGS_CACHE_MAX_SIZE users' results are kept, and the
+        least recently used result is discarded beyond that. The cached result is dropped early if the user joins
+        or leaves one of the MonitoredGuilds. If a lookup for the same user is already in progress, this waits on
+        that lookup instead of starting a second one."""
+
+        if (cached := self.mutual_mgs_cache.get(actor.id)) is not None:
+            cached_at, cached_mutual_mgs = cached
+            if time.monotonic() - cached_at < MUTUAL_MGS_CACHE_TTL:
+                self.mutual_mgs_cache.move_to_end(actor.id)
+                fcy_logger.debug("Mutual guilds for actor ID %s (cached): %s", actor.id, cached_mutual_mgs)
+                return list(cached_mutual_mgs)
+            del self.mutual_mgs_cache[actor.id]
+
+        if (lookup := self.inflight_mutual_mgs_lookups.get(actor.id)) is None:
+            lookup = asyncio.create_task(self.query_mutual_monitored_guilds(actor))
+            self.inflight_mutual_mgs_lookups[actor.id] = lookup
+
+            def forget_lookup(task: asyncio.Task, actor_id: ActorID = actor.id) -> None:
+                if self.inflight_mutual_mgs_lookups.get(actor_id) is task:
+                    del self.inflight_mutual_mgs_lookups[actor_id]
+
+            lookup.add_done_callback(forget_lookup)
+        return list(await asyncio.shield(lookup))  # One waiter being cancelled shouldn't cancel the lookup for everyone else
+
+    async def query_mutual_monitored_guilds(self, actor: Actor) -> list[fcy_guilds.MonitoredGuild]:
+        """Ask every MonitoredGuild whether it contains the provided Actor, and cache the resulting list of MonitoredGuilds.
+
+        If the Actor joins or leaves a MonitoredGuild while this is running, forget_mutual_monitored_guilds drops this
+        lookup from inflight_mutual_mgs_lookups; the result might already be out of date by then, so it isn't cached."""
+
+        monitored_guilds = fcy_constants.ENABLED_MONITORED_GUILD_OBJECTS
+        results = await asyncio.gather(
+            *(self.fetch_monitored_guild_member(monitored_guild, actor) for monitored_guild in monitored_guilds),
+            return_exceptions = True,
+        )
 
         mutual_mgs = []
-        for monitored_guild in fcy_constants.ENABLED_MONITORED_GUILDS.values():
-            try:
-                _ = await monitored_guild.guild.fetch_member(actor.id)
-                mutual_mgs.append(monitored_guild)
-            except discord.Forbidden:
+        for monitored_guild, result in zip(monitored_guilds, results):
+            if isinstance(result, discord.Forbidden):
                 fcy_logger.error(
-                    f"Attempted to fetch a member from MonitoredGuild {monitored_guild.name}, "
-                    "but permission was denied to perform this action!"
+                    "Attempted to fetch a member from MonitoredGuild %s, but permission was denied to perform this action!",
+                    monitored_guild.name,
                 )
-            except discord.HTTPException:  # This is thrown by discord in the event that the user is not found
+            elif isinstance(result, discord.HTTPException):  # This is thrown by discord in the event that the user is not found
                 pass  # If we don't find them, that's fine; just move on
+            elif isinstance(result, BaseException):
+                raise result
+            elif result is not None:
+                mutual_mgs.append(monitored_guild)
 
-        fcy_logger.debug(f"Mutual guilds for actor ID {actor.id}: {mutual_mgs}")
+        fcy_logger.debug("Mutual guilds for actor ID %s: %s", actor.id, mutual_mgs)
+        if self.inflight_mutual_mgs_lookups.get(actor.id) is asyncio.current_task():
+            self.mutual_mgs_cache[actor.id] = (time.monotonic(), mutual_mgs)
+            if len(self.mutual_mgs_cache) > MUTUAL_MGS_CACHE_MAX_SIZE:
+                self.mutual_mgs_cache.popitem(last = False)
         return mutual_mgs
 
+    def forget_mutual_monitored_guilds(self, actor_id: ActorID) -> None:
+        """Forget any cached or in-progress mutual MonitoredGuilds for the provided Actor ID, including the in-progress
+        per-MonitoredGuild member lookups, which were sent before the change and so can't be reused.
+        This needs to be called whenever the Actor joins or leaves a MonitoredGuild."""
+        self.mutual_mgs_cache.pop(actor_id, None)
+        self.inflight_mutual_mgs_lookups.pop(actor_id, None)
+        for monitored_guild_id in fcy_constants.ENABLED_MONITORED_GUILD_IDS:
+            self.inflight_member_lookups.pop((monitored_guild_id, actor_id), None)
+
     def check_populate_installed_guilds(self) -> None:
         """This executes a number of checks on the bot's InstalledGuilds, and attempts to populate
         InstalledGuild.guild. This is run as part of the on_ready process."""
 
+        bot_guilds = {guild.id: guild for guild in self.bot.guilds}
         for installed_guild in fcy_constants.ALL_ENABLED_GUILD_OBJECTS:
-            if installed_guild.id not in {guild.id for guild in self.bot.guilds}:
+            if (guild := bot_guilds.get(installed_guild.id)) is None:
                 fcy_logger.error(
-                    f"The bot is configured for Guild ID {installed_guild.id}, "
-                    "but the bot is not installed in that Guild!"
-                )
-                raise commands.GuildNotFound(str(installed_guild.id))
-
-            if (guild := self.bot.get_guild(installed_guild.id)) is None:
-                fcy_logger.error(
-                    f"Tried to set InstalledGuild.guild for Guild ID {installed_guild.id}, "
-                    "but was unable to retrieve the Guild object from Discord!"
+                    "The bot is configured for Guild ID %s, but the bot is not installed in that Guild!",
+                    installed_guild.id,
                 )
                 raise commands.GuildNotFound(str(installed_guild.id))
 
             installed_guild.guild = guild
+            installed_guild.invalidate_roles_dict()
+            if isinstance(installed_guild, fcy_guilds.AlertGuild):
+                installed_guild.invalidate_alert_channel()
+                try:  # Resolve the alert channel now, so that a misconfiguration shows up in the log at startup
+                    installed_guild.get_alert_channel()
+                except (commands.ChannelNotFound, TypeError):
+                    # One AlertGuild's bad alert channel shouldn't stop the bot from starting up for everyone else;
+                    # send_alerts will skip this AlertGuild (and log it again) until the channel is fixed.
+                    fcy_logger.exception("Could not resolve the alert channel for AlertGuild %s!", installed_guild)
 
         fcy_logger.info("All InstalledGuilds detected successfully. Populated self.guild for all Installed Guilds.")
 
     async def populate_alert_guild_members(self) -> None:
         """This process runs during startup (in on_ready) to populate self.alert_guild_members, a type of
-        "limited member cache" that only tracks the members present in the configured AlertGuilds."""
+        "limited member cache" that only tracks the members present in the configured AlertGuilds.
+
+        Each AlertGuild's member list is paginated independently, so all of the AlertGuilds are fetched concurrently."""
 
-        for alert_guild in fcy_constants.ENABLED_ALERT_GUILDS.values():
-            async for member in alert_guild.guild.fetch_members():
-                self.alert_guild_members.add(str(member.id))
+        async def fetch_alert_guild_member_ids(alert_guild: fcy_guilds.AlertGuild) -> set[ActorID]:
+            return {member.id async for member in alert_guild.guild.fetch_members(limit = None)}
+
+        member_id_sets = await asyncio.gather(
+            *(fetch_alert_guild_member_ids(alert_guild) for alert_guild in fcy_constants.ENABLED_ALERT_GUILD_OBJECTS)
+        )
+        self.alert_guild_members.update(*member_id_sets)
+        self.alert_guild_members_ready.set()
 
         fcy_logger.info("Populated FCYFunctionality.alert_guild_members.")
 
+    async def populate_alert_guild_members_with_retries(self) -> None:
+        """Run populate_alert_guild_members, retrying every POPULATE_RETRY_DELAY seconds if Discord returns an error,
+        since /alert can't be used at all until alert_guild_members has been populated."""
+        while True:
+            try:
+                await self.populate_alert_guild_members()
+                return
+            except discord.HTTPException:
+                fcy_logger.exception(
+                    "Failed to populate FCYFunctionality.alert_guild_members; retrying in %s seconds.",
+                    POPULATE_RETRY_DELAY,
+                )
+                await asyncio.sleep(POPULATE_RETRY_DELAY)
+
     async def validate_command_environment(self, ctx: discord.ApplicationContext):
         """Validate that a command is being run in an appropriate environment.
 
@@ -175,8 +379,11 @@ class FCYFunctionality(commands.Cog):
                 delete_after = 60,
             )
             fcy_logger.info(
-                f"Sent invalid location error to {self.bot.pprint_actor_name(ctx.author)} as a result of their invocation "
-                f"of {ctx.command.name} at {self.bot.get_current_utc_iso_time_str()}, with options: {ctx.selected_options}"
+                "Sent invalid location error to %s as a result of their invocation of %s at %s, with options: %s",
+                self.bot.pprint_actor_name(ctx.author),
+                ctx.command.name,
+                self.bot.get_current_utc_iso_time_str(),
+                ctx.selected_options,
             )
             raise CommandUserError
 
@@ -204,8 +411,11 @@ class FCYFunctionality(commands.Cog):
                 delete_after = 30,
             )
             fcy_logger.info(
-                f"Sent non-ID User ID error to {self.bot.pprint_actor_name(ctx.author)} as a result of their invocation "
-                f"of {ctx.command.name} at {self.bot.get_current_utc_iso_time_str()}, with options: {ctx.selected_options}"
+                "Sent non-ID User ID error to %s as a result of their invocation of %s at %s, with options: %s",
+                self.bot.pprint_actor_name(ctx.author),
+                ctx.command.name,
+                self.bot.get_current_utc_iso_time_str(),
+                ctx.selected_options,
             )
             raise CommandUserError
 
@@ -240,8 +450,11 @@ class FCYFunctionality(commands.Cog):
                 delete_after = 30,
             )
             fcy_logger.info(
-                f"Sent User ID not found error to {self.bot.pprint_actor_name(ctx.author)} as a result of their invocation "
-                f"of {ctx.command.name} at {self.bot.get_current_utc_iso_time_str()}, with options: {ctx.selected_options}"
+                "Sent User ID not found error to %s as a result of their invocation of %s at %s, with options: %s",
+                self.bot.pprint_actor_name(ctx.author),
+                ctx.command.name,
+                self.bot.get_current_utc_iso_time_str(),
+                ctx.selected_options,
             )
             raise CommandUserError from ex
 
@@ -256,13 +469,43 @@ class FCYFunctionality(commands.Cog):
             user_id: A user-provided User ID in string form.
 
         Raises:
-            CommandUserError: The user with the provided User ID was found to be a member of one or more AlertGuilds.
+            CommandUserError: The user with the provided User ID was found to be a member of one or more AlertGuilds,
+                or alert_guild_members hasn't finished being populated yet, so the check couldn't be performed.
                 Callers should NOT proceed with the execution of the command.
         """
+        if not self.alert_guild_members_ready.is_set():
+            try:  # The interaction has been deferred, but we still don't want to leave the user waiting for too long
+                await asyncio.wait_for(self.alert_guild_members_ready.wait(), timeout = 10)
+            except asyncio.TimeoutError as ex:
+                if self.alert_guild_members_task is not None and self.alert_guild_members_task.done():
+                    # The population gave up with an error that retrying wouldn't fix, so we aren't "starting up".
+                    error_kind = "population-failed"
+                    error_content = (
+                        "Sorry, I couldn't load the list of moderators, so I can't raise alerts right now.\n"
+                        "Please let the bot's maintainer know."
+                    )
+                else:
+                    error_kind = "still-starting-up"
+                    error_content = (
+                        "Sorry, I'm still starting up, so I can't raise alerts just yet.\n"
+                        "Please try again in a minute or two."
+                    )
+                await ctx.respond(content = error_content, ephemeral = True, delete_after = 30)
+                fcy_logger.info(
+                    "Sent %s error to %s as a result of their invocation of %s at %s, with options: %s",
+                    error_kind,
+                    self.bot.pprint_actor_name(ctx.author),
+                    ctx.command.name,
+                    self.bot.get_current_utc_iso_time_str(),
+                    ctx.selected_options,
+                )
+                raise CommandUserError from ex
+
+        target_user_id = int(user_id)
         if (
-            user_id in self.alert_guild_members  # The user is in an AlertGuild (which are private for moderators)
-            and user_id not in fcy_constants.TESTING_USER_IDS  # And this check hasn't been bypassed for testing purposes
-            and not user_id == str(ctx.author.id)  # And the user isn't raising a self alert (that's handled separately)
+            target_user_id in self.alert_guild_members  # The user is in an AlertGuild (which are private for moderators)
+            and target_user_id not in fcy_constants.TESTING_USER_IDS  # And this check hasn't been bypassed for testing purposes
+            and target_user_id != ctx.author.id  # And the user isn't raising a self alert (that's handled separately)
         ):
             await ctx.respond(
                 content = (
@@ -275,14 +518,18 @@ class FCYFunctionality(commands.Cog):
                 delete_after = 60,
             )
             fcy_logger.info(
-                f"Sent moderator User ID error to {self.bot.pprint_actor_name(ctx.author)} as a result of their invocation "
-                f"of {ctx.command.name} at {self.bot.get_current_utc_iso_time_str()}, with options: {ctx.selected_options}"
+                "Sent moderator User ID error to %s as a result of their invocation of %s at %s, with options: %s",
+                self.bot.pprint_actor_name(ctx.author),
+                ctx.command.name,
+                self.bot.get_current_utc_iso_time_str(),
+                ctx.selected_options,
             )
             raise CommandUserError
 
     async def fetch_most_recent_bans(self, guild: discord.Guild, max_bans: int = 5) -> list[discord.AuditLogEntry]:
-        """This wraps the process of retrieving the most recent Audit Log events for bans in the server."""
-        return await guild.audit_logs(action = discord.AuditLogAction.ban, limit = max_bans).flatten()
+        """This wraps the process of retrieving the most recent Audit Log events for bans in the server.
+        The `limit` passed to audit_logs bounds the pagination, so no more than max_bans entries are ever requested."""
+        return [entry async for entry in guild.audit_logs(action = discord.AuditLogAction.ban, limit = max_bans)]
 
     async def decorate_ban(self, ban_ale: discord.AuditLogEntry) -> str:
         """This "decorates" an AuditLogEntry pertaining to a user ban, to provide a pretty-printed
@@ -294,6 +541,11 @@ class FCYFunctionality(commands.Cog):
             f"({ban_ale.reason or '[No reason provided]'})"
         )[:100]  # These values can only be up to 100 characters long
 
+    async def decorate_bans(self, ban_ales: list[discord.AuditLogEntry]) -> list[str]:
+        """This decorates a list of AuditLogEntries pertaining to user bans, as per decorate_ban.
+        Each decoration requires its own user lookup, so they're all done concurrently."""
+        return list(await asyncio.gather(*(self.decorate_ban(ban_ale) for ban_ale in ban_ales)))
+
     def determine_command_environment(
         self,
         ctx: discord.ApplicationContext
@@ -323,33 +575,39 @@ class FCYFunctionality(commands.Cog):
         list of roles with the AlertGuild's guild_notification_roles; if we find exactly one match,
         we can return the name of that role.
 
-        - If we find no matches, or more than one match, dispatch a View to ask the user which server to use."""
+        - If we find no matches, or more than one match, dispatch a View to ask the user which server to use
+        (unless the AlertGuild only has one notification role to choose from, in which case we return that one)."""
 
         invoking_member = typing.cast(discord.Member, ctx.interaction.user)
         invoking_guild = ctx.interaction.guild
-        if invoking_guild is None or invoking_guild.id not in fcy_constants.ALL_ENABLED_GUILDS:
+        if invoking_guild is None or invoking_guild.id not in fcy_constants.ALL_ENABLED_GUILD_IDS:
             raise commands.GuildNotFound(str(invoking_guild.id) if invoking_guild else "[None]")
 
         if (  # Excluding the testing guilds from this check allows the ServerSelectView to be tested more easily
-            invoking_guild.id in fcy_constants.ENABLED_MONITORED_GUILDS
+            invoking_guild.id in fcy_constants.ENABLED_MONITORED_GUILD_IDS
             and invoking_guild.id not in fcy_constants.ENABLED_TESTING_GUILDS
         ):
             return fcy_constants.ENABLED_MONITORED_GUILDS[invoking_guild.id].name
 
         # At this point, the invoking guild must be an AlertGuild
         invoking_alert_guild = fcy_constants.ENABLED_ALERT_GUILDS[invoking_guild.id]
-        member_notification_roles = [
-            role.name for role in invoking_member.roles
-            if role.id in invoking_alert_guild.guild_notification_roles.values()
-        ]
+        notification_role_ids = invoking_alert_guild.notification_role_ids
+        member_notification_roles = [role for role in invoking_member.roles if role.id in notification_role_ids]
 
         if len(member_notification_roles) == 1: # The user had exactly one notification role
-            return member_notification_roles[0]
+            return member_notification_roles[0].name
+
+        if member_notification_roles:
+            option_roles = member_notification_roles
+        else:  # Only look up the AlertGuild's notification roles if we actually need to offer all of them
+            roles_dict = invoking_alert_guild.roles_dict
+            option_roles = sorted(  # Roles sort by their position in the Guild, which keeps them in the order of Guild.roles
+                roles_dict[role_id] for role_id in notification_role_ids if role_id in roles_dict
+            )
+        if len(option_roles) == 1:  # There's only one server the alert could be coming from, so there's no need to ask
+            return option_roles[0].name
 
-        options = member_notification_roles if member_notification_roles else [
-            role.name for role in invoking_alert_guild.guild.roles
-            if role.id in invoking_alert_guild.guild_notification_roles.values()
-        ]
+        options = [discord.SelectOption(label = role.name) for role in option_roles]
 
         prompt = (
             "I wasn't able to automatically determine which server is raising this alert.\n"
@@ -361,6 +619,13 @@ class FCYFunctionality(commands.Cog):
         await selection_view.wait()
         return selection_view.selection
 
+    @functools.cached_property
+    def emg_string(self) -> str:
+        """The list of enabled, non-testing MonitoredGuilds, as displayed in the "servers scanned" field of an alert.
+        The guild configuration doesn't change while the bot is running, so this only needs to be built once."""
+        emg_names = ", ".join([g.name for g in fcy_constants.ENABLED_MONITORED_GUILD_OBJECTS if g.testing is False])
+        return f"{emg_names}\n(To include your server in this list, message Lux in #bot.)"
+
     def generate_base_alert_embed(
         self,
         offending_actor: Actor,
@@ -373,9 +638,6 @@ class FCYFunctionality(commands.Cog):
         The embed generated is the "base embed" - i.e., it will not contain any references to roles
         for a particular server, since we don't yet know which server this alert is being sent to."""
 
-        emg_names = ", ".join([g.name for g in fcy_constants.ENABLED_MONITORED_GUILDS.values() if g.testing is False])
-        emg_string = f"{emg_names}\n(To include your server in this list, message Lux in #bot.)"
-
         base_embed = (
             discord.Embed(type = "rich", timestamp = None)
             .set_author(
@@ -386,7 +648,7 @@ class FCYFunctionality(commands.Cog):
             .set_footer(text = str(offending_actor.id))
             .add_field(name = "Relevant server", value = alerting_server_name, inline = False)
             .add_field(name = "Reason for alert", value = alert_reason or "[No reason provided]", inline = False)
-            .add_field(name = "Servers scanned for offending user", value = emg_string, inline = False)
+            .add_field(name = "Servers scanned for offending user", value = self.emg_string, inline = False)
         )
 
         return base_embed
@@ -431,7 +693,7 @@ class FCYFunctionality(commands.Cog):
 
         await ctx.respond(
             content = decorated_body,
-            embed = (base_embed.add_field(name = "Scanned servers with user", value = decorated_mgs, inline = False)),
+            embed = base_embed.copy().add_field(name = "Scanned servers with user", value = decorated_mgs, inline = False),
             ephemeral = True,
             delete_after = None,
             **message_kwargs,
@@ -445,6 +707,7 @@ class FCYFunctionality(commands.Cog):
             attachment_url = attachment_url,
             message_body = f"New **self**-alert raised by {self.bot.pprint_actor_name(ctx.author)}!",
             testing_guilds_only = True,
+            base_embed = base_embed,  # This has already been built above, so there's no need to build it again
             **message_kwargs,
         )
 
@@ -456,48 +719,89 @@ class FCYFunctionality(commands.Cog):
         attachment_url: Optional[str] = None,
         message_body: Optional[str] = None,
         testing_guilds_only: bool = False,
+        base_embed: Optional[discord.Embed] = None,  # If not provided, this is built from the parameters above
         **kwargs,  # Can include any additional kwargs to Interaction.send/send_message
     ) -> None:
         """This handles the process of sending a prepared alert out to ALL configured AlertGuilds."""
 
         fcy_logger.debug(
             "send_alerts called with the following parameters: "
-            f"offending_actor: {offending_actor}, "
-            f"alerting_server_name: {alerting_server_name}, "
-            f"alert_reason: {alert_reason}, "
-            f"attachment_url: {attachment_url}, "
-            f"message_body: {message_body}, "
-            f"testing_guilds_only: {testing_guilds_only}, "
+            "offending_actor: %s, "
+            "alerting_server_name: %s, "
+            "alert_reason: %s, "
+            "attachment_url: %s, "
+            "message_body: %s, "
+            "testing_guilds_only: %s, ",
+            offending_actor,
+            alerting_server_name,
+            alert_reason,
+            attachment_url,
+            message_body,
+            testing_guilds_only,
         )
 
-        base_embed = self.generate_base_alert_embed(
-            offending_actor = offending_actor,
-            alerting_server_name = alerting_server_name,
-            alert_reason = alert_reason,
-            attachment_url = attachment_url,
-        )
+        if base_embed is None:
+            base_embed = self.generate_base_alert_embed(
+                offending_actor = offending_actor,
+                alerting_server_name = alerting_server_name,
+                alert_reason = alert_reason,
+                attachment_url = attachment_url,
+            )
         mutual_mgs = await self.get_mutual_monitored_guilds(offending_actor)
 
-        guilds_to_alert = [
-            ag for ag in fcy_constants.ENABLED_ALERT_GUILDS.values()
-            if not (testing_guilds_only is True and ag.testing is False)
-        ]
-        fcy_logger.debug(f"Preparing to send alerts to the following AlertGuilds: {[str(g) for g in guilds_to_alert]}")
-
+        guilds_to_alert = (
+            fcy_constants.ENABLED_TESTING_ALERT_GUILD_OBJECTS if testing_guilds_only is True
+            else fcy_constants.ENABLED_ALERT_GUILD_OBJECTS
+        )
+        fcy_logger.debug("Preparing to send alerts to the following AlertGuilds: %s", [str(g) for g in guilds_to_alert])
+
+        # Each AlertGuild's embed differs from the base embed only by its final field, so build every embed from
+        # a single serialized copy of the base embed, rather than copying the whole Embed object for each AlertGuild.
+        base_embed_dict = base_embed.to_dict()
+        base_embed_fields = base_embed_dict.get("fields", [])
+        alerts_to_send: list[tuple[fcy_guilds.AlertGuild, discord.TextChannel, str, discord.Embed]] = []
+        failures: list[BaseException] = []
         for alert_guild in guilds_to_alert:
-            await alert_guild.get_alert_channel().send(
-                content = alert_guild.decorate_message_body(message_body),
-                embed = (
-                    base_embed.copy()
-                    .add_field(
-                        name = "Scanned servers with user",
-                        value = alert_guild.decorate_mutual_guilds(mutual_mgs),
-                        inline = False,
-                    )
-                ),
-                **kwargs,
-            )
-            fcy_logger.debug(f"Sent an alert to the following AlertGuild: {alert_guild!s}")
+            try:
+                channel = alert_guild.get_alert_channel()
+            except (commands.ChannelNotFound, TypeError) as ex:
+                # A problem with one AlertGuild's alert channel shouldn't stop the others from receiving the alert.
+                fcy_logger.error("Failed to find the alert channel for AlertGuild %s!", alert_guild, exc_info = ex)
+                failures.append(ex)
+                continue
+
+            alerts_to_send.append((
+                alert_guild,
+                channel,
+                alert_guild.decorate_message_body(message_body),
+                discord.Embed.from_dict(base_embed_dict | {"fields": base_embed_fields + [{
+                    "name": "Scanned servers with user",
+                    "value": alert_guild.decorate_mutual_guilds(mutual_mgs),
+                    "inline": False,
+                }]}),
+            ))
+
+        async def send_alert(channel: discord.TextChannel, content: str, embed: discord.Embed) -> discord.Message:
+            async with self.alert_send_semaphore:
+                return await channel.send(content = content, embed = embed, **kwargs)
+
+        # The alerts are independent of one another, so send them all at once - up to MAX_CONCURRENT_ALERT_SENDS
+        # at a time, so that a large fan-out doesn't run into Discord's global rate limit.
+        # A failure to send to one AlertGuild shouldn't stop the others from receiving the alert.
+        results = await asyncio.gather(
+            *(send_alert(channel, content, embed) for _, channel, content, embed in alerts_to_send),
+            return_exceptions = True,
+        )
+
+        for (alert_guild, *_), result in zip(alerts_to_send, results):
+            if isinstance(result, BaseException):
+                fcy_logger.error("Failed to send an alert to AlertGuild %s!", alert_guild, exc_info = result)
+                failures.append(result)
+            else:
+                fcy_logger.debug("Sent an alert to the following AlertGuild: %s", alert_guild)
+
+        if failures:  # Once every AlertGuild has been attempted, let the caller know that something went wrong
+            raise failures[0]
 
     @commands.slash_command(
         name = "scan",
@@ -514,6 +818,10 @@ class FCYFunctionality(commands.Cog):
     async def slash_scan(self, ctx: discord.ApplicationContext, user_id: str) -> None:
         """Executes the flow to scan the MonitoredGuilds from a slash command, responding to the user ephemerally."""
 
+        # Looking the user up and scanning the MonitoredGuilds can outlast Discord's deadline for responding
+        # to an interaction, so defer the response first; every response below is ephemeral anyway.
+        await ctx.defer(ephemeral = True)
+
         # Perform some pre-execution validations.
         try:
             await self.validate_command_environment(ctx)
@@ -571,23 +879,25 @@ class FCYFunctionality(commands.Cog):
     ) -> None:
         """Executes the flow to create and send an alert from a slash command. Responds to the user ephemerally."""
 
-        # First, perform some validations that can be done easily and QUICKLY.
-        # If these validations pass, we'll always then defer the response since we'll have a fair amount of work to do.
+        ##########################################################################################
+        # Some of the validations below can take a while (waiting for alert_guild_members to be populated,
+        # asking Discord for the user), and Discord needs a response within 3 seconds, so defer the response first.
+        await ctx.defer(ephemeral = True, invisible = False)
+        # Everything that happens beneath this line is working with a DEFERRED ApplicationContext!
+        ##########################################################################################
+
+        # The checks that only need data we already have are run before the one that needs to ask Discord for the user.
         try:
             await self.validate_command_environment(ctx)
             await self.validate_user_id_format(ctx, user_id)
-            solidified_actor = await self.get_and_validate_user_from_id(ctx, user_id)
             await self.validate_target_user_not_moderator(ctx, user_id)
+            solidified_actor = (
+                ctx.author if int(user_id) == ctx.author.id  # For a self-alert, we already have the Actor in hand
+                else await self.get_and_validate_user_from_id(ctx, user_id)
+            )
         except CommandUserError:
             return
 
-        ##########################################################################################
-        # If we can't respond quickly, we need to do a bunch of work before responding.
-        # This takes time, so we need to defer the response to the interaction while we work.
-        await ctx.defer(ephemeral = True, invisible = False)
-        # Everything that happens beneath this line is working with a DEFERRED ApplicationContext!
-        ##########################################################################################
-
         # If the user is creating an alert against themself, that's valid, but we have a separate
         # execution flow for that, which sends it ephemerally and doesn't ping anyone.
         if solidified_actor == ctx.author:
@@ -598,23 +908,55 @@ class FCYFunctionality(commands.Cog):
             )
             return
 
-        # Once all checks have passed, we can proceed to create and send the alerts.
-        await self.send_alerts(
-            offending_actor = solidified_actor,
-            alerting_server_name = await self.determine_alert_server(ctx),
-            alert_reason = reason,
-            attachment_url = attachment.url if attachment else None,
-            message_body = (
-                f"New alert raised by {self.bot.pprint_actor_name(ctx.author)}!\n"
-                "_(To raise an alert yourself, use the `/alert` command in <#960480902331383809>.)_"
-            ),
-            testing_guilds_only = ctx.guild.id in fcy_constants.ENABLED_TESTING_GUILDS, # type: ignore - we know that the Guild won't be None
-        )
+        alerting_server_name = await self.determine_alert_server(ctx)
+        testing_guilds_only = ctx.guild.id in fcy_constants.ENABLED_TESTING_GUILDS  # type: ignore - we know that the Guild won't be None
+
+        # If an alert for this same user started going out moments ago (e.g. two moderators responding to the same
+        # incident at once), don't broadcast a duplicate; just wait for the existing alert to finish being sent.
+        # An alert only going to the testing AlertGuilds must never absorb a real one (or vice versa), so the
+        # in-flight alerts are keyed by testing_guilds_only as well as by the user.
+        inflight_key = (solidified_actor.id, testing_guilds_only)
+        if (
+            (inflight_alert := self.inflight_alerts.get(inflight_key)) is not None
+            and time.monotonic() - inflight_alert[0] < ALERT_COALESCE_WINDOW
+        ):
+            fcy_logger.info(
+                "Merged an alert for actor ID %s by %s into an alert already in progress, discarding "
+                "alerting_server_name: %s, reason: %s, attachment_url: %s",
+                solidified_actor.id,
+                self.bot.pprint_actor_name(ctx.author),
+                alerting_server_name,
+                reason,
+                attachment.url if attachment else None,
+            )
+            await asyncio.shield(inflight_alert[1])
+            response_message = "An alert for this user was already being raised just now, so it wasn't sent a second time."
+
+        else:  # Once all checks have passed, we can proceed to create and send the alerts.
+            alert_task = asyncio.create_task(self.send_alerts(
+                offending_actor = solidified_actor,
+                alerting_server_name = alerting_server_name,
+                alert_reason = reason,
+                attachment_url = attachment.url if attachment else None,
+                message_body = (
+                    f"New alert raised by {self.bot.pprint_actor_name(ctx.author)}!\n"
+                    "_(To raise an alert yourself, use the `/alert` command in <#960480902331383809>.)_"
+                ),
+                testing_guilds_only = testing_guilds_only,
+            ))
+
+            def forget_inflight_alert(task: asyncio.Task, key: tuple[ActorID, bool] = inflight_key) -> None:
+                if (inflight_alert := self.inflight_alerts.get(key)) is not None and inflight_alert[1] is task:
+                    del self.inflight_alerts[key]
+
+            self.inflight_alerts[inflight_key] = (time.monotonic(), alert_task)
+            alert_task.add_done_callback(forget_inflight_alert)
+            await asyncio.shield(alert_task)  # Other moderators' alerts may have been merged into this one
+            response_message = "Successfully raised an alert."
 
         # When we go to respond, we don't know whether we had to ask the user for more information about the server.
         # As a result, we need to try edit the original response first (in case we sent the view), then respond normally
         # if Discord raises an error that it can't find any original response (in case we never sent the view).
-        response_message = "Successfully raised an alert."
         try:
             await ctx.interaction.edit_original_response(content = response_message, delete_after = 10, view = None)
         except discord.HTTPException:  # We never sent the ServerSelectView, so edit_original_response doesn't work
@@ -626,12 +968,12 @@ class ServerSelectView(discord.ui.View):
     raised for. In many use-cases, we can deduce the server from  the context of the interaction, but if more
     information is needed, this View can be dispatched to collect it."""
 
-    options: list[str]
+    options: list[discord.SelectOption]
     select_menu: discord.ui.Select
 
     selection: str
 
-    def __init__(self, options: list[str]) -> None:
+    def __init__(self, options: list[discord.SelectOption]) -> None:
         super().__init__()
         self.options = options
 
@@ -640,7 +982,7 @@ class ServerSelectView(discord.ui.View):
             placeholder = "Which server should this alert come from?",
             min_values = 1,
             max_values = 1,
-            options = [discord.SelectOption(label = option) for option in self.options],
+            options = self.options,
         )
         self.select_menu.callback = self.select_callback
 
@@ -1,13 +1,19 @@
 """This file defines a number of constants and globals used by other components of the Full Course Yellow bot."""
 
-from fcy_guilds import MonitoredGuild, AlertGuild
-from fcy_types import *  # pylint: disable = wildcard-import, unused-wildcard-import
+import logging
+from types import MappingProxyType
+from typing import Mapping
 
-FULL_COURSE_YELLOW_USER_ID = "1105933971264647168"
-LUX_USER_ID = "145582654857805825"
-LUX_TESTING_USER_ID = "1086293154304634910"
+from fcy_guilds import InstalledGuild, MonitoredGuild, AlertGuild
+from fcy_types import ActorID, GuildID
 
-TESTING_USER_IDS = {LUX_TESTING_USER_ID}
+fcy_logger = logging.getLogger("full_course_yellow")
+
+FULL_COURSE_YELLOW_USER_ID: ActorID = 1105933971264647168
+LUX_USER_ID: ActorID = 145582654857805825
+LUX_TESTING_USER_ID: ActorID = 1086293154304634910
+
+TESTING_USER_IDS: frozenset[ActorID] = frozenset({LUX_TESTING_USER_ID})
 
 LUX_DEV_MG = MonitoredGuild(
     1079109375647555695,
@@ -62,33 +68,69 @@ SMS_AG = AlertGuild(
     },
 )
 
-# Expose some dicts as public collections of MonitoredGuilds and AlertGuilds.
+# Every MonitoredGuild and AlertGuild defined above needs to be listed here, or the bot won't know about it.
+_MONITORED_GUILDS: tuple[MonitoredGuild, ...] = (
+    LUX_DEV_MG,
+    R_F1_MG,
+    OF1D_MG,
+    WILLIAMS_MG,
+    YES2_MG,
+    MCLAREN_MG,
+    R_WEC_MG,
+    NASCAR_MG,
+    LTL_MG,
+    ORBR_MG,
+    IMSA_MG,
+    EXTREME_E_MG,
+    R_INDYCAR_MG,
+    ALPINE_MG,
+)
+_ALERT_GUILDS: tuple[AlertGuild, ...] = (
+    LUX_DEV_AG,
+    SMS_AG,
+)
+
+# Expose some dicts as public collections of MonitoredGuilds and AlertGuilds, ordered by name.
+# The sort is stable, so sorting everything at once and then splitting by type gives the same order as sorting each type.
+_GUILDS_BY_NAME: list[InstalledGuild] = sorted((*_MONITORED_GUILDS, *_ALERT_GUILDS), key = lambda ig: ig.name.casefold())
+
 ALL_MONITORED_GUILDS: dict[GuildID, MonitoredGuild] = {
-    mg_object.id: mg_object
-    for mg_object in sorted(
-        [obj for obj in locals().values() if isinstance(obj, MonitoredGuild)],
-        key = lambda mg_object: mg_object.name.casefold()
-    )
+    ig.id: ig for ig in _GUILDS_BY_NAME if isinstance(ig, MonitoredGuild)
 }
 ENABLED_MONITORED_GUILDS = {mg_id: mg for mg_id, mg in ALL_MONITORED_GUILDS.items() if mg.enabled is True}
+ENABLED_MONITORED_GUILD_OBJECTS: tuple[MonitoredGuild, ...] = tuple(ENABLED_MONITORED_GUILDS.values())
 
 ALL_ALERT_GUILDS: dict[GuildID, AlertGuild] = {
-    ag_object.id: ag_object
-    for ag_object in sorted(
-        [obj for obj in locals().values() if isinstance(obj, AlertGuild)],
-        key = lambda ag_object: ag_object.name.casefold()
-    )
+    ig.id: ig for ig in _GUILDS_BY_NAME if isinstance(ig, AlertGuild)
 }
 ENABLED_ALERT_GUILDS = {ag_id: ag for ag_id, ag in ALL_ALERT_GUILDS.items() if ag.enabled is True}
+ENABLED_ALERT_GUILD_OBJECTS: tuple[AlertGuild, ...] = tuple(ENABLED_ALERT_GUILDS.values())
+ENABLED_TESTING_ALERT_GUILD_OBJECTS: tuple[AlertGuild, ...] = tuple(ag for ag in ENABLED_ALERT_GUILD_OBJECTS if ag.testing is True)
 
-ALL_GUILDS = ALL_MONITORED_GUILDS | ALL_ALERT_GUILDS
-ALL_GUILD_OBJECTS = set(ALL_MONITORED_GUILDS.values()) | set(ALL_ALERT_GUILDS.values())
-ALL_ENABLED_GUILDS = ENABLED_MONITORED_GUILDS | ENABLED_ALERT_GUILDS
-ALL_ENABLED_GUILD_OBJECTS = set(ENABLED_MONITORED_GUILDS.values()) | set(ENABLED_ALERT_GUILDS.values())
+# A Guild can be both a MonitoredGuild and an AlertGuild. The AlertGuilds come last here, so the mappings below
+# (which are keyed by Guild ID) keep the AlertGuild; the *_OBJECTS frozensets contain both.
+_ALL_GUILD_OBJECTS: tuple[InstalledGuild, ...] = (*ALL_MONITORED_GUILDS.values(), *ALL_ALERT_GUILDS.values())
+ALL_GUILDS: Mapping[GuildID, InstalledGuild] = MappingProxyType({ig.id: ig for ig in _ALL_GUILD_OBJECTS})
+ALL_GUILD_OBJECTS: frozenset[InstalledGuild] = frozenset(_ALL_GUILD_OBJECTS)
+ALL_ENABLED_GUILDS: Mapping[GuildID, InstalledGuild] = MappingProxyType(
+    {ig.id: ig for ig in _ALL_GUILD_OBJECTS if ig.enabled is True}
+)
+ALL_ENABLED_GUILD_OBJECTS: frozenset[InstalledGuild] = frozenset(ig for ig in _ALL_GUILD_OBJECTS if ig.enabled is True)
 
 ALL_TESTING_GUILDS = {ig_id: ig for ig_id, ig in ALL_GUILDS.items() if ig.testing is True}
 ENABLED_TESTING_GUILDS = {ig_id: ig for ig_id, ig in ALL_TESTING_GUILDS.items() if ig.enabled is True}
 
-if __name__ == "__main__":
-    breakpoint() # pylint: disable = forgotten-debug-statement
-    pass # pylint: disable = unnecessary-pass
+# Expose frozensets of Guild IDs for places that only need to check whether a Guild is of a certain kind.
+ENABLED_MONITORED_GUILD_IDS: frozenset[GuildID] = frozenset(ENABLED_MONITORED_GUILDS)
+ENABLED_ALERT_GUILD_IDS: frozenset[GuildID] = frozenset(ENABLED_ALERT_GUILDS)
+ALL_ENABLED_GUILD_IDS: frozenset[GuildID] = frozenset(ALL_ENABLED_GUILDS)
+
+
+def _warn_about_placeholder_ale_handlers() -> None:
+    """Log a warning for each enabled MonitoredGuild that hasn't been given a real audit log handler yet."""
+    for monitored_guild in ENABLED_MONITORED_GUILD_OBJECTS:
+        if monitored_guild.audit_log_handler is MonitoredGuild.placeholder_ale_handler:
+            fcy_logger.warning("MonitoredGuild %s is enabled, but its audit log handler is a placeholder!", monitored_guild.name)
+
+
+_warn_about_placeholder_ale_handlers()
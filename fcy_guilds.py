@@ -6,24 +6,35 @@ from __future__ import annotations
 import discord  # This uses pycord, not discord.py
 from discord.ext import commands
 import logging
+import re
+from types import MappingProxyType
 import typing
-from typing import Callable, Optional
+from typing import Callable, Mapping, Optional
 
-from fcy_types import *  # pylint: disable = wildcard-import, unused-wildcard-import
+from fcy_types import ActorID, ChannelID, GuildID, RoleID
 
 fcy_logger = logging.getLogger("full_course_yellow")
 
+RF1_MODERATION_BOT_IDS: frozenset[ActorID] = frozenset({
+    424900962449358848,  # Formula One
+    886984180800577636,  # Formula One Dev
+})
+RF1_TEMPORARY_BAN_REGEX = re.compile(r"10 day ban|30 day ban")
+
 
 class InstalledGuild:
     """An InstalledGuild represents a Guild on which the bot is installed.
     This might be a Guild that is monitored for new bans (a MonitoredGuild),
     or a Guild that receives alert messages about new bans (an AlertGuild)."""
 
+    __slots__ = ("id", "name", "enabled", "testing", "guild", "_roles_dict")
+
     id: GuildID
     name: str
     enabled: bool  # A flag indicating whether the Guild is ready for use in production
     testing: bool  # A flag indicating whether the Guild is a testing server
     guild: discord.Guild  # This will get set during bot.on_ready
+    _roles_dict: Optional[dict[RoleID, discord.Role]]  # The cached value of roles_dict, or None if it needs rebuilding
 
     def __init__(
         self,
@@ -36,6 +47,7 @@ class InstalledGuild:
         self.name = name
         self.enabled = enabled
         self.testing = testing
+        self._roles_dict = None
 
     def __repr__(self) -> str:
         return (
@@ -49,14 +61,32 @@ class InstalledGuild:
 
     @property
     def roles_dict(self) -> dict[RoleID, discord.Role]:
-        """A dict of {Role ID: Role} for all roles in the guild, making it O(1) to look up a Role by ID."""
-        return {role.id: role for role in self.guild.roles}
+        """A dict of {Role ID: Role} for all roles in the guild, making it O(1) to look up a Role by ID.
+        This is built the first time it's needed, and then cached until invalidate_roles_dict is called."""
+        if self._roles_dict is None:
+            self._roles_dict = {role.id: role for role in self.guild.roles}
+        return self._roles_dict
+
+    def invalidate_roles_dict(self) -> None:
+        """Discard the cached roles_dict, so that it gets rebuilt the next time it's accessed.
+        This needs to be called whenever the Guild (or its set of roles) changes."""
+        self._roles_dict = None
 
 
 class AlertGuild(InstalledGuild):
     """An AlertGuild is a type of InstalledGuild that has a channel that
     posts new alert messages from this bot."""
 
+    __slots__ = (
+        "alert_channel_id",
+        "general_notification_role_id",
+        "guild_notification_roles",
+        "notification_role_ids",
+        "message_body_prefix",
+        "guild_notification_role_mentions",
+        "_alert_channel",
+    )
+
     id: GuildID
     name: str
     enabled: bool  # A flag indicating whether the Guild is ready for use in production
@@ -65,7 +95,11 @@ class AlertGuild(InstalledGuild):
 
     alert_channel_id: ChannelID
     general_notification_role_id: Optional[RoleID]
-    guild_notification_roles: dict[GuildID, RoleID]
+    guild_notification_roles: Mapping[GuildID, RoleID]  # Read-only, since the attributes below are derived from it
+    notification_role_ids: frozenset[RoleID]  # The IDs of all of the Roles in guild_notification_roles
+    message_body_prefix: str  # What decorate_message_body prepends to message bodies
+    guild_notification_role_mentions: dict[GuildID, str]  # guild_notification_roles, but with the roles as mention strings
+    _alert_channel: Optional[discord.TextChannel]  # The cached result of get_alert_channel, or None if it needs resolving
 
     def __init__(
         self,
@@ -80,23 +114,38 @@ class AlertGuild(InstalledGuild):
         super().__init__(id, name, enabled, testing)
         self.alert_channel_id = alert_channel_id
         self.general_notification_role_id = general_notification_role_id
-        self.guild_notification_roles = guild_notification_roles or {}
+        self.guild_notification_roles = MappingProxyType(dict(guild_notification_roles or {}))
+        self.notification_role_ids = frozenset(self.guild_notification_roles.values())
+        self.message_body_prefix = (
+            "" if self.general_notification_role_id is None
+            else f"<@&{self.general_notification_role_id}> "
+        )
+        self.guild_notification_role_mentions = {
+            guild_id: f"<@&{role_id}>" for guild_id, role_id in self.guild_notification_roles.items()
+        }
+        self._alert_channel = None
 
     def get_alert_channel(self) -> discord.TextChannel:
-        """Returns this AlertGuild's alert channel, after doing some error checking."""
+        """Returns this AlertGuild's alert channel, after doing some error checking.
+        The channel is resolved the first time it's needed, and then cached until invalidate_alert_channel is called."""
+        if self._alert_channel is not None:
+            return self._alert_channel
         if (channel := self.guild.get_channel(self.alert_channel_id)) is None:
             raise commands.ChannelNotFound(str(self.alert_channel_id))
         if not isinstance(channel, discord.TextChannel):
             raise TypeError(f"{self.alert_channel_id} is not a text channel")
-        return channel  # This is guaranteed to be a valid TextChannel now
+        self._alert_channel = channel  # This is guaranteed to be a valid TextChannel now
+        return channel
+
+    def invalidate_alert_channel(self) -> None:
+        """Discard the cached alert channel, so that it gets resolved again the next time it's needed.
+        This needs to be called whenever the Guild (or the alert channel itself) changes."""
+        self._alert_channel = None
 
     def decorate_message_body(self, message_body: Optional[str]) -> str:
         """"Decorates" the provided message body by prepending this AlertGuild's
         general-notification Role, if one has been defined for this AlertGuild."""
-        return (
-            (message_body or "") if self.general_notification_role_id is None
-            else f"<@&{self.general_notification_role_id}> {message_body or ''}"
-        )
+        return self.message_body_prefix + (message_body or "")
 
     def decorate_mutual_guilds(self, mutual_guilds: list[MonitoredGuild]) -> str:
         """"Decorates" the provided list of mutual guilds by transforming the guilds in it into
@@ -105,16 +154,16 @@ class AlertGuild(InstalledGuild):
         if not mutual_guilds:
             decoration = "[Not found in any scanned server]"
         else:
-            decoration = ", ".join(
-                guild.name if guild.id not in self.guild_notification_roles
-                else f"<@&{self.guild_notification_roles[guild.id]}>"
-                for guild in mutual_guilds
+            role_mentions = self.guild_notification_role_mentions
+            decoration = ", ".join([role_mentions.get(guild.id, guild.name) for guild in mutual_guilds])
+
+        if fcy_logger.isEnabledFor(logging.DEBUG):  # Don't build the list of Guild IDs unless it's actually going to be logged
+            fcy_logger.debug(
+                "AlertGuild %s called to decorate mutual_guilds with Guild IDs: %s. Result: %s.",
+                self.name,
+                [g.id for g in mutual_guilds],
+                decoration,
             )
-
-        fcy_logger.debug(
-            f"AlertGuild {self.name} called to decorate mutual_guilds with Guild IDs: "
-            f"{[g.id for g in mutual_guilds]}. Result: {decoration}."
-        )
         return decoration
 
 
@@ -123,6 +172,8 @@ class MonitoredGuild(InstalledGuild):
 
     The audit_log_handler callable is run when a new audit log entry is created"""
 
+    __slots__ = ("audit_log_handler",)
+
     id: GuildID
     name: str
     enabled: bool  # A flag indicating whether the Guild is ready for use in production
@@ -142,9 +193,6 @@ class MonitoredGuild(InstalledGuild):
         super().__init__(id, name, enabled, testing)
         self.audit_log_handler = audit_log_handler
 
-        if self.enabled and self.audit_log_handler is self.placeholder_ale_handler:
-            fcy_logger.warning(f"MonitoredGuild {self.name} is enabled, but its audit log handler is a placeholder!")
-
     @staticmethod
     def true_ale_handler(_: discord.AuditLogEntry) -> bool:
         """Handle AuditLogEntries for servers for which bans are
@@ -171,14 +219,11 @@ def rf1_ale_handler(entry: discord.AuditLogEntry) -> bool:
     banning_moderator = typing.cast(discord.Member, entry.user)
 
     # If the user was banned outside of the normal moderation system, raise an alert.
-    if banning_moderator.id not in {
-        424900962449358848,  # Formula One
-        886984180800577636,  # Formula One Dev
-    }:
+    if banning_moderator.id not in RF1_MODERATION_BOT_IDS:
         return True
 
     # If the ban is temporary, don't raise an alert.
-    if entry.reason and any(x in entry.reason for x in ["10 day ban", "30 day ban"]):
+    if entry.reason and RF1_TEMPORARY_BAN_REGEX.search(entry.reason):
         return False
 
     # Otherwise, this is a permanent ban - raise an alert.
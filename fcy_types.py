@@ -8,3 +8,4 @@ GuildID = Snowflake
 RoleID = Snowflake
 ActorID = Snowflake
 Actor = discord.User | discord.Member
+ActorTypes = (discord.User, discord.Member)  # The same types as Actor, as a tuple for use in isinstance checks
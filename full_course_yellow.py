@@ -4,19 +4,28 @@ or other critera as specified for that server.
 When a new ban is detected, a message is sent to the "Staff of Motorsport Discords" server, alerting all mod staff
 of the new ban, and providing information about whether the newly-banned user is present in any of the other servers."""
 
+import asyncio
+import collections
 import datetime
 import discord  # This uses pycord, not discord.py
 from discord.ext import commands
 import logging
+import pathlib
 import sys
+import time
 from typing import Any
 
+try:
+    import uvloop
+except ImportError:  # uvloop is optional; without it, the bot runs on the default asyncio event loop
+    uvloop = None
+
 import fcy_cogs
-from fcy_types import *  # pylint: disable = wildcard-import, unused-wildcard-import
+from fcy_types import Actor, ActorID, ActorTypes
 
 logging.basicConfig(level=logging.INFO)
 (fcy_logger := logging.getLogger("full_course_yellow")).setLevel(logging.DEBUG)
-pycord_logger = logging.getLogger("discord")
+(pycord_logger := logging.getLogger("discord")).setLevel(logging.WARNING)  # pycord is very chatty below WARNING
 
 TOKEN_FILENAME = "token.txt"
 INTENTS = discord.Intents.default()
@@ -28,16 +37,25 @@ ALLOWED_MENTIONS = discord.AllowedMentions(
     users = False,
     replied_user = True,
 )
+UTC = datetime.timezone.utc
+ACTOR_CACHE_TTL = 300  # How long (in seconds) solidify_actor_abstract reuses an Actor it fetched from Discord
+ACTOR_CACHE_MAX_SIZE = 1024  # How many Actors solidify_actor_abstract keeps cached before discarding the least recently used
 
 
 class FCYBot(discord.Bot):
     """This subclass of Bot defines the Full Course Yellow bot."""
 
+    actor_cache: collections.OrderedDict[ActorID, tuple[float, Actor]]  # {Actor ID: (time.monotonic() when fetched, Actor)}
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.actor_cache = collections.OrderedDict()  # Ordered from least to most recently used
+
     @staticmethod
     def get_current_utc_iso_time_str() -> str:
         """This is a shortcut to get a simple datetime string in the form
         `YYYY-MM-DD HH:MM:SS UTC` for the current UTC date and time."""
-        return datetime.datetime.now(datetime.timezone.utc).strftime(r"%Y-%m-%d %H:%M:%S UTC")
+        return datetime.datetime.now(UTC).isoformat(sep = " ", timespec = "seconds").replace("+00:00", " UTC")
 
     @staticmethod
     def pprint_timedelta_from_timestamp(timestamp: datetime.datetime) -> str:
@@ -45,24 +63,27 @@ class FCYBot(discord.Bot):
         and quickly print out "H hours, M minutes ago". An attempt is made to ensure
         timezone awareness."""
 
-        current_datetime = datetime.datetime.now(datetime.timezone.utc)
+        current_datetime = datetime.datetime.now(UTC)
 
         if timestamp.tzinfo is None or timestamp.tzinfo.utcoffset(timestamp) is None:
             # The timestamp is timezone-naive
-            timedelta = current_datetime - timestamp.replace(tzinfo = datetime.timezone.utc)
+            timedelta = current_datetime - timestamp.replace(tzinfo = UTC)
         else:
             # The timestamp is timezone-aware
             timedelta = current_datetime - timestamp
 
         days = timedelta.days
-        hours = timedelta.seconds // 3600
-        minutes = (timedelta.seconds % 3600) // 60
-
-        return ", ".join([
-            f"{days} days" if days > 0 else "",
-            f"{hours} hours" if hours > 0 else "",
-            f"{minutes} minutes" if minutes > 0 else "",
-        ]) + " ago"
+        hours, seconds = divmod(timedelta.seconds, 3600)
+        minutes = seconds // 60
+
+        parts = []
+        if days > 0:
+            parts.append(f"{days} days")
+        if hours > 0:
+            parts.append(f"{hours} hours")
+        if minutes > 0:
+            parts.append(f"{minutes} minutes")
+        return (", ".join(parts) or "0 minutes") + " ago"
 
     @staticmethod
     def pprint_actor_name(actor: Actor) -> str:
@@ -78,13 +99,8 @@ class FCYBot(discord.Bot):
         """Given an ApplicationContext in which options were provided, return the value of the option
         whose name is the provided `option_name`. If the option was not provided at all, return None."""
 
-        if option_name in {option.name for option in ctx.unselected_options or []}:
-            return None
-
-        if ctx.selected_options is None:
-            return None
-
-        for option_dict in ctx.selected_options:
+        # Options that weren't provided never show up in selected_options, so there's no need to check unselected_options.
+        for option_dict in ctx.selected_options or []:
             if option_name in option_dict:
                 return option_dict[option_name]
 
@@ -93,15 +109,26 @@ class FCYBot(discord.Bot):
     async def solidify_actor_abstract(self, actor_abstract: Actor | int | str | None) -> Actor:
         """This takes a "Actor abstract" - a nebulous parameter that might be a fully-fledged Actor,
         or their user ID in integer form, their user ID in string form, or None. The actor abstract is then
-        "solidified" into a real Actor, if possible. If not possible, commands.UserNotFound is raised."""
+        "solidified" into a real Actor, if possible. If not possible, commands.UserNotFound is raised.
+
+        Actors fetched from Discord are cached for ACTOR_CACHE_TTL seconds, since the same user tends to be
+        looked up several times in quick succession (e.g. when several moderators respond to the same incident).
+        At most ACTOR_CACHE_MAX_SIZE Actors are cached; beyond that, the least recently used Actor is discarded."""
 
         if actor_abstract is None:
             raise commands.UserNotFound("Attempted to solidify the provided Actor abstract, but it is None!")
 
-        if isinstance(actor_abstract, Actor):
+        if isinstance(actor_abstract, ActorTypes):
             return actor_abstract
 
         user_id = int(actor_abstract)
+        if (cached := self.actor_cache.get(user_id)) is not None:
+            cached_at, cached_actor = cached
+            if time.monotonic() - cached_at < ACTOR_CACHE_TTL:
+                self.actor_cache.move_to_end(user_id)
+                return cached_actor
+            del self.actor_cache[user_id]
+
         try:
             actor = await self.fetch_user(user_id)
         except discord.errors.HTTPException as ex:
@@ -116,6 +143,9 @@ class FCYBot(discord.Bot):
                 f"but could not find any Discord user with user ID {user_id}!"
             )
 
+        self.actor_cache[user_id] = (time.monotonic(), actor)
+        if len(self.actor_cache) > ACTOR_CACHE_MAX_SIZE:
+            self.actor_cache.popitem(last = False)
         return actor
 
     async def on_error(  # pylint: disable = arguments-differ
@@ -130,9 +160,9 @@ class FCYBot(discord.Bot):
 
         if (ex := sys.exception()) is None:
             fcy_logger.error(
-                f"on_error was called during the execution of {event} "
-                f"at {self.get_current_utc_iso_time_str()}, "
-                "but no exception was raised."
+                "on_error was called during the execution of %s at %s, but no exception was raised.",
+                event,
+                self.get_current_utc_iso_time_str(),
             )
             return
 
@@ -140,8 +170,9 @@ class FCYBot(discord.Bot):
             raise ex
         except Exception:  # pylint: disable = broad-exception-caught
             fcy_logger.exception( # This only works inside an exception handler
-                f"Exception raised during the handling of {event} "
-                f"at {self.get_current_utc_iso_time_str()}: "
+                "Exception raised during the handling of %s at %s: ",
+                event,
+                self.get_current_utc_iso_time_str(),
             )
 
     async def on_application_command_error(
@@ -163,39 +194,50 @@ class FCYBot(discord.Bot):
             raise exception
         except commands.CommandError:
             fcy_logger.exception( # This only works inside an exception handler
-                f"Exception raised during the invocation of {context.command.name} "
-                f"by {self.pprint_actor_name(context.author)} ({context.author.id}) "
-                f"at {self.get_current_utc_iso_time_str()}"
+                "Exception raised during the invocation of %s by %s (%s) at %s",
+                context.command.name,
+                self.pprint_actor_name(context.author),
+                context.author.id,
+                self.get_current_utc_iso_time_str(),
             )
 
     async def on_application_command(self, ctx: discord.ApplicationContext) -> None:
         """This listener implements custom logging for whenever a Command is invoked."""
         fcy_logger.info(
-            f"{ctx.command.name} invoked by {self.pprint_actor_name(ctx.author)} ({ctx.author.id}) "
-            f"in {ctx.guild.name if ctx.guild else 'DMs'} "
-            f"at {self.get_current_utc_iso_time_str()}, with options: {ctx.selected_options}"
+            "%s invoked by %s (%s) in %s at %s, with options: %s",
+            ctx.command.name,
+            self.pprint_actor_name(ctx.author),
+            ctx.author.id,
+            ctx.guild.name if ctx.guild else "DMs",
+            self.get_current_utc_iso_time_str(),
+            ctx.selected_options,
         )
 
 
 def read_token(token_filename: str) -> str:
-    """Load the bot's token from the file."""
-    try:
-        with open(token_filename, "r", encoding = "utf-8") as infile:
-            return infile.read().strip()
-    except FileNotFoundError:
-        fcy_logger.exception(f"Could not find the token filename on disk: {TOKEN_FILENAME}")
-        sys.exit(1)
+    """Load the bot's token from the file. Raises FileNotFoundError if the file doesn't exist."""
+    return pathlib.Path(token_filename).read_text(encoding = "utf-8").strip()
 
 
 def main():
     """Execute top-level functionality - load the token and start the bot."""
+    try:  # Load the token first, so that a missing token file stops the bot before anything else gets set up
+        token = read_token(TOKEN_FILENAME)
+    except FileNotFoundError:
+        fcy_logger.error("Could not find the token filename on disk: %s", TOKEN_FILENAME)
+        sys.exit(1)
+
+    if uvloop is not None:  # This needs to happen before the bot is created, since the bot grabs its event loop on init
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        fcy_logger.info("Using uvloop for the bot's event loop.")
+
     bot = FCYBot(
         intents = INTENTS,
         member_cache_flags = MEMBER_CACHE_FLAGS,
         allowed_mentions = ALLOWED_MENTIONS,
     )
     bot.add_cog(fcy_cogs.FCYFunctionality(bot))
-    bot.run(token = read_token(TOKEN_FILENAME))
+    bot.run(token = token)
 
 
 if __name__ == "__main__":